@@ -3,28 +3,41 @@ Test import with small sample (first 1000 rows)
 Use this to verify import logic before running full import
 """
 
-import json
-import psycopg2
-from psycopg2.extras import execute_batch
 from pathlib import Path
-from datetime import datetime
-import os
-from dotenv import load_dotenv
+from datetime import datetime, date
+import csv
+from io import StringIO
+from itertools import islice
 
-load_dotenv()
+from import_data import (
+    get_connection, iter_ndjson, _json, create_stage, merge_stage, drop_stage, refresh_views,
+    BUSINESS_COLUMNS, CATEGORY_COLUMNS, USER_COLUMNS
+)
 
 DATASET_DIR = Path(__file__).parent.parent / 'yelp_dataset'
 SAMPLE_SIZE = 1000
 
-def get_connection():
-    """Create database connection"""
-    return psycopg2.connect(
-        host=os.getenv('DB_HOST', 'localhost'),
-        port=os.getenv('DB_PORT', '5433'),
-        database=os.getenv('DB_NAME', 'yelp'),
-        user=os.getenv('DB_USER', 'postgres'),
-        password=os.getenv('DB_PASSWORD', 'postgres')
+def write_row(writer, row):
+    """
+    Write one row for COPY (CSV) as it is parsed.
+
+    csv.writer handles quoting of commas, quotes and newlines in values;
+    None is written as \\N so it loads as NULL.
+    """
+    writer.writerow(['\\N' if value is None else value for value in row])
+
+def load_csv(cursor, table, columns, buffer):
+    """
+    COPY a CSV buffer into the importer's UNLOGGED staging table, then merge
+    it into the target, skipping rows that already exist.
+    """
+    buffer.seek(0)
+    create_stage(cursor, table, columns)
+    cursor.copy_expert(
+        f"COPY {table}_stage ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')", buffer
     )
+    merge_stage(cursor, table, columns)
+    drop_stage(cursor, table)
 
 def test_businesses():
     """Test business import with sample"""
@@ -34,54 +47,45 @@ def test_businesses():
     cursor = conn.cursor()
 
     filepath = DATASET_DIR / 'yelp_academic_dataset_business.json'
-    business_batch = []
-    category_batch = []
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if i >= SAMPLE_SIZE:
-                break
-
-            record = json.loads(line)
-
-            business_batch.append((
-                record['business_id'],
-                record.get('name'),
-                record.get('address'),
-                record.get('city'),
-                record.get('state'),
-                record.get('postal_code'),
-                record.get('latitude'),
-                record.get('longitude'),
-                record.get('stars'),
-                record.get('review_count', 0),
-                record.get('is_open', 1)
-            ))
-
-            # Categories
-            categories = record.get('categories')
-            if categories:
-                for category in categories.split(', '):
-                    category_batch.append((
-                        record['business_id'],
-                        category.strip()
-                    ))
-
-    # Insert
-    execute_batch(cursor, """
-        INSERT INTO businesses
-        (business_id, name, address, city, state, postal_code,
-         latitude, longitude, stars, review_count, is_open)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (business_id) DO NOTHING
-    """, business_batch)
-
-    if category_batch:
-        execute_batch(cursor, """
-            INSERT INTO business_categories (business_id, category)
-            VALUES (%s, %s)
-            ON CONFLICT DO NOTHING
-        """, category_batch)
+
+    # Rows are written straight into the COPY buffers while parsing, with
+    # no intermediate lists of tuples
+    business_buffer = StringIO()
+    category_buffer = StringIO()
+    business_writer = csv.writer(business_buffer, lineterminator='\n')
+    category_writer = csv.writer(category_buffer, lineterminator='\n')
+
+    for line in islice(iter_ndjson(filepath), SAMPLE_SIZE):
+        record = _json.loads(line)
+
+        write_row(business_writer, (
+            record['business_id'],
+            record.get('name'),
+            record.get('address'),
+            record.get('city'),
+            record.get('state'),
+            record.get('postal_code'),
+            record.get('latitude'),
+            record.get('longitude'),
+            record.get('stars'),
+            record.get('review_count', 0),
+            record.get('is_open', 1)
+        ))
+
+        # Categories
+        categories = record.get('categories')
+        if categories:
+            category_writer.writerows(
+                (record['business_id'], category.strip()) for category in categories.split(', ')
+            )
+
+    # Insert. The sample load is re-runnable, so the commit need not wait
+    # for the WAL flush
+    cursor.execute("SET LOCAL synchronous_commit = off")
+    load_csv(cursor, 'businesses', BUSINESS_COLUMNS, business_buffer)
+
+    if category_buffer.tell():
+        load_csv(cursor, 'business_categories', CATEGORY_COLUMNS, category_buffer)
 
     conn.commit()
 
@@ -102,61 +106,46 @@ def test_users():
     cursor = conn.cursor()
 
     filepath = DATASET_DIR / 'yelp_academic_dataset_user.json'
-    user_batch = []
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if i >= SAMPLE_SIZE:
-                break
-
-            record = json.loads(line)
-
-            yelping_since = None
-            if record.get('yelping_since'):
-                try:
-                    # Try with timestamp first
-                    yelping_since = datetime.strptime(
-                        record['yelping_since'], '%Y-%m-%d %H:%M:%S'
-                    ).date()
-                except ValueError:
-                    # Fall back to date only
-                    yelping_since = datetime.strptime(
-                        record['yelping_since'], '%Y-%m-%d'
-                    ).date()
-
-            user_batch.append((
-                record['user_id'],
-                record.get('name'),
-                record.get('review_count', 0),
-                yelping_since,
-                record.get('useful', 0),
-                record.get('funny', 0),
-                record.get('cool', 0),
-                record.get('fans', 0),
-                record.get('average_stars'),
-                record.get('compliment_hot', 0),
-                record.get('compliment_more', 0),
-                record.get('compliment_profile', 0),
-                record.get('compliment_cute', 0),
-                record.get('compliment_list', 0),
-                record.get('compliment_note', 0),
-                record.get('compliment_plain', 0),
-                record.get('compliment_cool', 0),
-                record.get('compliment_funny', 0),
-                record.get('compliment_writer', 0),
-                record.get('compliment_photos', 0)
-            ))
-
-    # Insert
-    execute_batch(cursor, """
-        INSERT INTO users
-        (user_id, name, review_count, yelping_since, useful, funny, cool, fans,
-         average_stars, compliment_hot, compliment_more, compliment_profile,
-         compliment_cute, compliment_list, compliment_note, compliment_plain,
-         compliment_cool, compliment_funny, compliment_writer, compliment_photos)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (user_id) DO NOTHING
-    """, user_batch)
+    user_buffer = StringIO()
+    user_writer = csv.writer(user_buffer, lineterminator='\n')
+
+    for line in islice(iter_ndjson(filepath), SAMPLE_SIZE):
+        record = _json.loads(line)
+
+        yelping_since = None
+        since = record.get('yelping_since')
+        if since:
+            # Date only or full timestamp; fromisoformat parses both in C
+            yelping_since = (date.fromisoformat(since) if len(since) == 10
+                             else datetime.fromisoformat(since).date())
+
+        write_row(user_writer, (
+            record['user_id'],
+            record.get('name'),
+            record.get('review_count', 0),
+            yelping_since,
+            record.get('useful', 0),
+            record.get('funny', 0),
+            record.get('cool', 0),
+            record.get('fans', 0),
+            record.get('average_stars'),
+            record.get('compliment_hot', 0),
+            record.get('compliment_more', 0),
+            record.get('compliment_profile', 0),
+            record.get('compliment_cute', 0),
+            record.get('compliment_list', 0),
+            record.get('compliment_note', 0),
+            record.get('compliment_plain', 0),
+            record.get('compliment_cool', 0),
+            record.get('compliment_funny', 0),
+            record.get('compliment_writer', 0),
+            record.get('compliment_photos', 0)
+        ))
+
+    # Insert. The sample load is re-runnable, so the commit need not wait
+    # for the WAL flush
+    cursor.execute("SET LOCAL synchronous_commit = off")
+    load_csv(cursor, 'users', USER_COLUMNS, user_buffer)
 
     conn.commit()
 
@@ -201,6 +190,8 @@ def main():
 
     test_businesses()
     test_users()
+    # high_fives and topBusiness_in_city read these views, not the tables
+    refresh_views(concurrently=True)
     show_counts()
 
     print("\n✅ Sample import test complete!")
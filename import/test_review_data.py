@@ -1,15 +1,59 @@
 """
 Test script to identify potential issues in review data before import
+
+Referenced user/business ids are checked against the database, so run this
+after businesses and users have been imported.
 """
 
 import json
 from pathlib import Path
 from collections import Counter
 from datetime import datetime
+from itertools import islice
+
+from import_data import iter_ndjson, get_connection, copy_rows, _json
 
 DATASET_DIR = Path(__file__).parent.parent / 'yelp_dataset'
 SAMPLE_SIZE = 100000  # Test first 100K reviews
 
+def check_references(references):
+    """
+    COPY (user_id, business_id) pairs into a temp table and count, in one
+    server-side pass, the distinct ids referenced and the reviews whose ids
+    are missing from users/businesses (NOT EXISTS anti-joins).
+
+    Returns (unique_users, unique_businesses, unknown_users, unknown_businesses).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            CREATE TEMP TABLE review_refs (
+                user_id VARCHAR(22),
+                business_id VARCHAR(22)
+            ) ON COMMIT DROP
+        """)
+        copy_rows(cursor, 'review_refs', ['user_id', 'business_id'], references)
+
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(DISTINCT user_id) FROM review_refs),
+                (SELECT COUNT(DISTINCT business_id) FROM review_refs),
+                (SELECT COUNT(*) FROM review_refs r
+                 WHERE r.user_id IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM users u WHERE u.user_id = r.user_id)),
+                (SELECT COUNT(*) FROM review_refs r
+                 WHERE r.business_id IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM businesses b WHERE b.business_id = r.business_id))
+        """)
+        return cursor.fetchone()
+
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+
 def test_review_data():
     """Analyze review data for potential import issues"""
 
@@ -31,88 +75,91 @@ def test_review_data():
         'special_chars_in_text': 0,
     }
 
-    unique_users = set()
-    unique_businesses = set()
-    sample_reviews = []
+    records = []
 
     print(f"\nAnalyzing first {SAMPLE_SIZE:,} reviews...")
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if i >= SAMPLE_SIZE:
-                break
-
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError as e:
-                print(f"Line {i}: JSON decode error: {e}")
-                continue
-
-            # Check required fields
-            if 'review_id' not in record or not record['review_id']:
-                issues['missing_review_id'] += 1
-
-            if 'user_id' not in record or not record['user_id']:
-                issues['missing_user_id'] += 1
-            else:
-                unique_users.add(record['user_id'])
-
-            if 'business_id' not in record or not record['business_id']:
-                issues['missing_business_id'] += 1
-            else:
-                unique_businesses.add(record['business_id'])
-
-            # Check stars
-            if 'stars' in record:
-                star_type = type(record['stars']).__name__
-                issues['star_types'][star_type] += 1
-
-                try:
-                    star_val = float(record['stars'])
-                    if star_val < 1 or star_val > 5:
-                        issues['invalid_stars'] += 1
-                except (ValueError, TypeError):
-                    issues['invalid_stars'] += 1
-
-            # Check date
-            if 'date' in record:
-                date_str = record['date']
-
-                # Detect format
-                if ' ' in date_str:
-                    issues['date_formats']['datetime'] += 1
-                else:
-                    issues['date_formats']['date_only'] += 1
-
-                try:
-                    datetime.strptime(date_str, '%Y-%m-%d').date()
-                except ValueError:
-                    try:
-                        datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S').date()
-                    except ValueError:
-                        issues['invalid_date'] += 1
-                        print(f"Line {i}: Invalid date format: {date_str}")
-
-            # Check text
-            if 'text' not in record or not record['text']:
-                issues['missing_text'] += 1
-            else:
-                text = record['text']
-                # Check for special characters that might cause COPY issues
-                if '\t' in text or '\\' in text or '\n' in text:
-                    issues['special_chars_in_text'] += 1
-
-            # Save first 5 reviews as examples
-            if len(sample_reviews) < 5:
-                sample_reviews.append(record)
+    for i, line in enumerate(islice(iter_ndjson(filepath), SAMPLE_SIZE)):
+        try:
+            records.append(_json.loads(line))
+        except json.JSONDecodeError as e:
+            print(f"Line {i}: JSON decode error: {e}")
+
+    # Checks run a column at a time: each column is pulled out once and
+    # tallied with C-level builtins (map/sum/Counter) instead of branching
+    # per row on every field
+    review_ids = [record.get('review_id') for record in records]
+    user_ids = [record.get('user_id') or None for record in records]
+    business_ids = [record.get('business_id') or None for record in records]
+    stars = [record['stars'] for record in records if 'stars' in record]
+    dates = [record['date'] for record in records if 'date' in record]
+    texts = [record.get('text') for record in records]
+
+    # Required fields
+    issues['missing_review_id'] = len(review_ids) - sum(map(bool, review_ids))
+    issues['missing_user_id'] = user_ids.count(None)
+    issues['missing_business_id'] = business_ids.count(None)
+    references = list(zip(user_ids, business_ids))
+
+    # Stars: only a handful of distinct values, so validate each once.
+    # Keyed by type name and repr (5 == 5.0, and a list or dict value
+    # from a malformed record is unhashable)
+    tally, samples = Counter(), {}
+    for value in stars:
+        key = (type(value).__name__, repr(value))
+        tally[key] += 1
+        samples.setdefault(key, value)
+    for key, count in tally.items():
+        value = samples[key]
+        issues['star_types'][key[0]] += count
+        try:
+            if not 1 <= float(value) <= 5:
+                issues['invalid_stars'] += count
+        except (ValueError, TypeError):
+            issues['invalid_stars'] += count
+
+    # Dates: 'YYYY-MM-DD' (10 chars) or 'YYYY-MM-DD HH:MM:SS'
+    date_lengths = Counter(map(len, dates))
+    date_only = date_lengths.pop(10, 0)
+    issues['date_formats'] += Counter(date_only=date_only, datetime=sum(date_lengths.values()))
+
+    # Walk records (not the filtered dates) so i identifies the review
+    for i, record in enumerate(records):
+        date_str = record.get('date')
+        if date_str is None:
+            continue
+        try:
+            # fromisoformat also accepts 'T' separators, basic '20200101'
+            # and UTC offsets, so check the fixed shape parse_date slices too
+            if not (len(date_str) in (10, 19) and date_str[4] == date_str[7] == '-'
+                    and (len(date_str) == 10 or date_str[10] == ' ')):
+                raise ValueError(date_str)
+            datetime.fromisoformat(date_str)
+        except ValueError:
+            issues['invalid_date'] += 1
+            print(f"Review {i}: Invalid date format: {date_str}")
+
+    # Text, including special characters that might cause COPY issues
+    issues['missing_text'] = len(texts) - sum(map(bool, texts))
+    issues['special_chars_in_text'] = sum(
+        1 for text in texts if text and ('\t' in text or '\\' in text or '\n' in text)
+    )
+
+    # Save first 5 reviews as examples
+    sample_reviews = records[:5]
+
+    # Referential checks run in the database
+    unique_users, unique_businesses, unknown_users, unknown_businesses = check_references(references)
 
     # Print results
     print("\n" + "="*60)
     print("VALIDATION RESULTS")
     print("="*60)
 
-    print(f"\nUnique users referenced: {len(unique_users):,}")
-    print(f"Unique businesses referenced: {len(unique_businesses):,}")
+    print(f"\nUnique users referenced: {unique_users:,}")
+    print(f"Unique businesses referenced: {unique_businesses:,}")
+    print(f"Reviews with unknown user_id: {unknown_users:,}")
+    print(f"Reviews with unknown business_id: {unknown_businesses:,}")
 
     print("\n--- Data Quality Issues ---")
     print(f"Missing review_id: {issues['missing_review_id']}")
@@ -147,8 +194,11 @@ def test_review_data():
     print("\n" + "="*60)
     print("RECOMMENDATION")
     print("="*60)
-    print("\n⚠️  CRITICAL: Reviews reference users/businesses that may not exist")
-    print("   Solution: Pre-load valid user_ids and business_ids, skip invalid references")
+    if unknown_users or unknown_businesses:
+        print("\n⚠️  CRITICAL: Reviews reference users/businesses that do not exist")
+        print("   Solution: Stage reviews and merge with EXISTS filters (see import_data.py)")
+    else:
+        print("\n✅ All referenced users and businesses exist")
 
     return unique_users, unique_businesses
 
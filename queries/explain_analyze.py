@@ -8,6 +8,8 @@ import psycopg2
 import os
 from dotenv import load_dotenv
 
+from query_functions import WARM_RELATIONS
+
 load_dotenv()
 
 def get_connection():
@@ -21,18 +23,16 @@ def get_connection():
     )
 
 
-def explain_query(query: str, params: tuple = None, query_name: str = "Query"):
+def explain_query(cursor, query: str, params: tuple = None, query_name: str = "Query"):
     """
     Run EXPLAIN ANALYZE on a query and display the execution plan
 
     Args:
+        cursor: Cursor on the shared analysis session
         query: SQL query to analyze
         params: Query parameters
         query_name: Descriptive name for the query
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     print("=" * 80)
     print(f"EXPLAIN ANALYZE: {query_name}")
     print("=" * 80)
@@ -53,19 +53,27 @@ def explain_query(query: str, params: tuple = None, query_name: str = "Query"):
     print()
     print("-" * 80)
 
-    cursor.close()
-    conn.close()
-
 
 if __name__ == '__main__':
     print("\n" + "=" * 80)
     print("QUERY EXECUTION PLAN ANALYSIS")
     print("=" * 80)
 
+    # One session for every plan, with the relations the queries read (the
+    # same set the test harnesses warm) loaded into shared buffers up front
+    # so each plan is timed against a warm cache
+    conn = get_connection()
+    conn.set_session(autocommit=True)
+    cursor = conn.cursor()
+
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_prewarm")
+    cursor.execute("SELECT pg_prewarm(rel::regclass) FROM unnest(%s::text[]) AS rel", (WARM_RELATIONS,))
+
     # Query 1: average_rating (FAST - baseline)
     explain_query(
+        cursor,
         """
-        SELECT AVG(stars)::DECIMAL(3,2)
+        SELECT ROUND(AVG(stars), 2)::float8
         FROM reviews
         WHERE user_id = %s
         """,
@@ -73,27 +81,19 @@ if __name__ == '__main__':
         "Query 1: average_rating"
     )
 
-    # Query 4: high_fives (MEDIUM - acceptable)
+    # Query 4: high_fives (reads the business_stats materialized view)
     explain_query(
+        cursor,
         """
         SELECT
             b.business_id,
             b.name,
-            ROUND(
-                COUNT(*) FILTER (WHERE r.stars = 5)::DECIMAL /
-                COUNT(*)::DECIMAL,
-                4
-            ) AS five_star_pct,
-            ROUND(
-                COUNT(*) FILTER (WHERE r.stars >= 2)::DECIMAL /
-                COUNT(*)::DECIMAL,
-                4
-            ) AS two_plus_star_pct
-        FROM businesses b
-        JOIN reviews r ON b.business_id = r.business_id
-        WHERE b.city = %s
-        GROUP BY b.business_id, b.name
-        HAVING COUNT(*) >= 15
+            ROUND(s.n_five_star::DECIMAL / s.n_reviews, 4)::float8 AS five_star_pct,
+            ROUND(s.n_two_plus_star::DECIMAL / s.n_reviews, 4)::float8 AS two_plus_star_pct
+        FROM business_stats s
+        JOIN businesses b ON b.business_id = s.business_id
+        WHERE s.city = %s
+          AND s.n_reviews >= 15
         ORDER BY five_star_pct DESC
         LIMIT %s
         """,
@@ -101,23 +101,20 @@ if __name__ == '__main__':
         "Query 4: high_fives (Philadelphia)"
     )
 
-    # Query 5: topBusiness_in_city (SLOW - needs optimization)
+    # Query 5: topBusiness_in_city (reads the business_stats materialized view)
     explain_query(
+        cursor,
         """
         SELECT
             b.business_id,
             b.name,
-            COUNT(DISTINCT elite_reviews.user_id) AS elite_review_count
-        FROM businesses b
-        JOIN (
-            SELECT DISTINCT r.business_id, r.user_id
-            FROM reviews r
-            WHERE r.user_id IN (SELECT DISTINCT user_id FROM user_elite_years)
-        ) elite_reviews ON b.business_id = elite_reviews.business_id
-        WHERE b.city = %s
-        GROUP BY b.business_id, b.name
-        HAVING COUNT(DISTINCT elite_reviews.user_id) >= %s
-        ORDER BY elite_review_count DESC
+            s.n_elite_reviewers AS elite_review_count
+        FROM business_stats s
+        JOIN businesses b ON b.business_id = s.business_id
+        WHERE s.city = %s
+          AND s.n_elite_reviewers >= %s
+          AND s.n_elite_reviewers > 0
+        ORDER BY s.n_elite_reviewers DESC
         LIMIT %s
         """,
         ('Tampa', 10, 10),
@@ -126,27 +123,27 @@ if __name__ == '__main__':
 
     # Same query for Philadelphia (larger dataset)
     explain_query(
+        cursor,
         """
         SELECT
             b.business_id,
             b.name,
-            COUNT(DISTINCT elite_reviews.user_id) AS elite_review_count
-        FROM businesses b
-        JOIN (
-            SELECT DISTINCT r.business_id, r.user_id
-            FROM reviews r
-            WHERE r.user_id IN (SELECT DISTINCT user_id FROM user_elite_years)
-        ) elite_reviews ON b.business_id = elite_reviews.business_id
-        WHERE b.city = %s
-        GROUP BY b.business_id, b.name
-        HAVING COUNT(DISTINCT elite_reviews.user_id) >= %s
-        ORDER BY elite_review_count DESC
+            s.n_elite_reviewers AS elite_review_count
+        FROM business_stats s
+        JOIN businesses b ON b.business_id = s.business_id
+        WHERE s.city = %s
+          AND s.n_elite_reviewers >= %s
+          AND s.n_elite_reviewers > 0
+        ORDER BY s.n_elite_reviewers DESC
         LIMIT %s
         """,
         ('Philadelphia', 10, 10),
         "Query 5: topBusiness_in_city (Philadelphia)"
     )
 
+    cursor.close()
+    conn.close()
+
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
     print("=" * 80)
@@ -6,17 +6,39 @@ All queries use proper indexing and are limited to single SQL statements.
 """
 
 import psycopg2
+from psycopg2.extensions import connection as _connection
+from psycopg2.pool import ThreadedConnectionPool
 from typing import List, Tuple, Optional
 import os
 import time
-from functools import wraps
-from dotenv import load_dotenv
+import logging
+import atexit
+import threading
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from dotenv import dotenv_values
 
-load_dotenv()
+# .env parsed once into a read-only mapping; real environment variables win,
+# as they would with load_dotenv(), and os.environ is left untouched
+_ENV = MappingProxyType({
+    **{key: value for key, value in dotenv_values().items() if value is not None},
+    **os.environ,
+})
+
+logger = logging.getLogger(__name__)
 
 
 def time_query(func):
-    """Decorator to measure and display query execution time"""
+    """
+    Decorator to measure and log query execution time.
+
+    Only active when QUERY_TIMING is set; otherwise the function is returned
+    unwrapped so library callers pay no timing or logging overhead.
+    """
+    if not _ENV.get('QUERY_TIMING'):
+        return func
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         start = time.perf_counter()
@@ -24,20 +46,148 @@ def time_query(func):
         elapsed = time.perf_counter() - start
 
         status = "✅" if elapsed < 1.0 else "⚠️"
-        print(f"{status} {func.__name__}() executed in {elapsed*1000:.2f}ms")
+        logger.info("%s %s() executed in %.2fms", status, func.__name__, elapsed * 1000)
 
         return result
     return wrapper
 
+class PooledConnection(_connection):
+    """Connection that remembers which statements it has PREPAREd"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+def _local_host(host: str, port: int) -> str:
+    """
+    Swap a loopback DB_HOST for the UNIX socket directory in DB_UNIX_DIR when
+    a socket for `port` exists there; libpq then skips the TCP stack entirely.
+
+    Opt-in only: socket connections are matched by pg_hba `local` rules
+    (often peer auth) rather than the `host` rules a TCP setup relies on.
+    """
+    socket_dir = _ENV.get('DB_UNIX_DIR')
+    if (socket_dir and host in ('localhost', '127.0.0.1')
+            and os.path.exists(os.path.join(socket_dir, f'.s.PGSQL.{port}'))):
+        return socket_dir
+    return host
+
+# Connection settings, read once at import
+_PORT = int(_ENV.get('DB_PORT', '5433'))
+_HOST = _local_host(_ENV.get('DB_HOST', 'localhost'), _PORT)
+# A local server gains nothing from TLS but would pay its handshake on every
+# new connection. Other hosts keep libpq's default (prefer); set DB_SSLMODE
+# (e.g. require) to insist on encryption
+_IS_LOCAL = _HOST in ('localhost', '127.0.0.1', '::1') or _HOST.startswith('/')
+_DSN = dict(
+    host=_HOST,
+    port=_PORT,
+    sslmode=_ENV.get('DB_SSLMODE', 'disable' if _IS_LOCAL else 'prefer'),
+    database=_ENV.get('DB_NAME', 'yelp'),
+    user=_ENV.get('DB_USER', 'postgres'),
+    password=_ENV.get('DB_PASSWORD', 'postgres'),
+    # Fail fast when the server is unreachable, and keep idle pooled
+    # connections alive through NAT/firewall idle timeouts
+    connect_timeout=int(_ENV.get('DB_CONNECT_TIMEOUT', '3')),
+    keepalives=1,
+    keepalives_idle=30,
+    keepalives_interval=10,
+    keepalives_count=3,
+    application_name='yelp_queries',
+    # Session settings ride in the startup packet instead of a SET round
+    # trip. JIT compilation costs tens of ms, more than these indexed
+    # lookups take to execute.
+    options='-c jit=off'
+)
+_POOL_MIN = int(_ENV.get('DB_POOL_MIN', '2'))
+_POOL_MAX = int(_ENV.get('DB_POOL_MAX', '16'))
+
+# Connections are opened once and reused: for sub-second queries the
+# TCP handshake and authentication of a fresh connection can cost more
+# than the query itself. The pool keeps DB_POOL_MIN connections open
+# between calls and allows up to DB_POOL_MAX concurrently. It is created
+# on first use, so importing this module never touches the database.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_CONNECT_ATTEMPTS = 3
+_CONNECT_COOLDOWN = 5.0  # Seconds to fail fast after the server was unreachable
+_last_connect_failure = None
+
+def _connect_pool():
+    """Open the pool, retrying transient connect failures with exponential backoff"""
+    for attempt in range(_CONNECT_ATTEMPTS):
+        try:
+            return ThreadedConnectionPool(
+                _POOL_MIN,
+                _POOL_MAX,
+                connection_factory=PooledConnection,
+                **_DSN
+            )
+        except psycopg2.OperationalError:
+            if attempt == _CONNECT_ATTEMPTS - 1:
+                raise
+            time.sleep(0.1 * 2 ** attempt)
+
+def _get_pool():
+    """Return the shared connection pool, creating it on first call"""
+    global _POOL, _last_connect_failure
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                # Don't hammer a server that just failed every attempt
+                if (_last_connect_failure is not None
+                        and time.monotonic() - _last_connect_failure < _CONNECT_COOLDOWN):
+                    raise psycopg2.OperationalError("database unreachable, retrying after cooldown")
+                try:
+                    _POOL = _connect_pool()
+                except psycopg2.OperationalError:
+                    _last_connect_failure = time.monotonic()
+                    raise
+                atexit.register(_POOL.closeall)
+    return _POOL
+
 def get_connection():
-    """Create database connection"""
-    return psycopg2.connect(
-        host=os.getenv('DB_HOST', 'localhost'),
-        port=os.getenv('DB_PORT', '5433'),
-        database=os.getenv('DB_NAME', 'yelp'),
-        user=os.getenv('DB_USER', 'postgres'),
-        password=os.getenv('DB_PASSWORD', 'postgres')
-    )
+    """Borrow a database connection from the pool (return it with release_connection)"""
+    conn = _get_pool().getconn()
+    # Read-only queries: autocommit avoids leaving the connection idle in a
+    # transaction that the pool would have to roll back on return
+    conn.autocommit = True
+    return conn
+
+def release_connection(conn):
+    """Return a borrowed connection to the pool"""
+    _get_pool().putconn(conn)
+
+@contextmanager
+def pg_conn():
+    """Borrow a pooled connection for the duration of a with block"""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+# Every statement PREPAREd so far (name -> sql), so fresh pooled
+# connections can be primed with all of them (see prime_connections)
+_STATEMENTS = {}
+
+def _prepare(cursor, name: str, sql: str):
+    """PREPARE `sql` as `name` on the cursor's connection unless it already has"""
+    conn = cursor.connection
+    if name not in conn.prepared:
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        conn.prepared.add(name)
+        _STATEMENTS[name] = sql
+
+def execute_prepared(cursor, name: str, sql: str, params: tuple):
+    """
+    Run `sql` (with $1, $2, ... placeholders) as a named prepared statement.
+
+    The statement is PREPAREd the first time a pooled connection sees it and
+    kept for the connection's lifetime, so later calls skip parse and plan.
+    """
+    _prepare(cursor, name, sql)
+    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
 
 
 @time_query
@@ -54,22 +204,18 @@ def average_rating(user_id: str) -> Optional[Tuple[str, float]]:
     Performance: O(n) where n = number of reviews by user
     Index used: idx_reviews_user_id
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT u.name, AVG(r.stars)::DECIMAL(3,2) AS avg_rating
-        FROM users u
-        JOIN reviews r ON u.user_id = r.user_id
-        WHERE u.user_id = %s
-        GROUP BY u.name
-    """, (user_id,))
+    with pg_conn() as conn, conn.cursor() as cursor:
+        execute_prepared(cursor, 'q_average_rating', """
+            SELECT u.name, ROUND(AVG(r.stars), 2)::float8 AS avg_rating
+            FROM users u
+            JOIN reviews r ON u.user_id = r.user_id
+            WHERE u.user_id = $1
+            GROUP BY u.name
+        """, (user_id,))
 
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
+        result = cursor.fetchone()
 
-    return (result[0], float(result[1])) if result else None
+    return result
 
 
 @time_query
@@ -84,29 +230,25 @@ def still_there(state: str) -> List[Tuple[str, str, str, float, float, float]]:
         List of tuples: (business_id, name, full_address, latitude, longitude, stars)
         Exactly 9 results (or fewer if state has <9 open businesses)
 
-    Performance: O(n log n) where n = businesses in state
-    Index used: idx_businesses_state_open, idx_businesses_review_count
+    Performance: O(log n) - stops after the first 9 matching index entries
+    Index used: idx_businesses_state_open_covering (index-only, ordered)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            business_id,
-            name,
-            CONCAT(address, ', ', city, ', ', state, ' ', postal_code) AS full_address,
-            latitude,
-            longitude,
-            stars
-        FROM businesses
-        WHERE state = %s AND is_open = 1
-        ORDER BY review_count DESC
-        LIMIT 9
-    """, (state,))
-
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pg_conn() as conn, conn.cursor() as cursor:
+        execute_prepared(cursor, 'q_still_there', """
+            SELECT
+                business_id,
+                name,
+                full_address,
+                latitude,
+                longitude,
+                stars
+            FROM businesses
+            WHERE state = $1 AND is_open = 1
+            ORDER BY review_count DESC
+            LIMIT 9
+        """, (state,))
+
+        results = cursor.fetchall()
 
     return results
 
@@ -123,24 +265,20 @@ def top_reviews(business_id: str) -> List[Tuple[str, str, int, str]]:
         List of tuples: (user_id, user_name, review_stars, review_text)
         Exactly 7 results (or fewer if business has <7 reviews)
 
-    Performance: O(n log n) where n = reviews for business
-    Index used: idx_reviews_business_id, idx_reviews_useful
+    Performance: O(log n) - reads the top 7 index entries, no join
+    Index used: idx_reviews_business_useful
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT r.user_id, u.name, r.stars, r.text
-        FROM reviews r
-        JOIN users u ON r.user_id = u.user_id
-        WHERE r.business_id = %s
-        ORDER BY r.useful DESC
-        LIMIT 7
-    """, (business_id,))
-
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pg_conn() as conn, conn.cursor() as cursor:
+        # user_name is denormalized into reviews, so users is never touched
+        execute_prepared(cursor, 'q_top_reviews', """
+            SELECT user_id, user_name, stars, text
+            FROM reviews
+            WHERE business_id = $1
+            ORDER BY useful DESC
+            LIMIT 7
+        """, (business_id,))
+
+        results = cursor.fetchall()
 
     return results
 
@@ -160,41 +298,30 @@ def high_fives(city: str, top_count: int) -> List[Tuple[str, str, str, int, floa
                         five_star_pct, two_plus_star_pct)
         Percentages are decimals (e.g., 0.85 = 85%)
 
-    Performance: O(n) where n = businesses in city with >=15 reviews
-    Index used: idx_businesses_city, idx_reviews_business_stars
+    Performance: O(n) where n = businesses in city (one precomputed stats row each)
+    Index used: idx_business_stats_city_reviews, businesses_pkey
+    Reads the business_stats materialized view: reviews are counted as of its
+    last REFRESH (run by import_data.py after every load)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            b.business_id,
-            b.name,
-            CONCAT(b.address, ', ', b.city, ', ', b.state, ' ', b.postal_code) AS full_address,
-            b.review_count,
-            b.stars,
-            ROUND(
-                COUNT(*) FILTER (WHERE r.stars = 5)::DECIMAL /
-                COUNT(*)::DECIMAL,
-                4
-            ) AS five_star_pct,
-            ROUND(
-                COUNT(*) FILTER (WHERE r.stars >= 2)::DECIMAL /
-                COUNT(*)::DECIMAL,
-                4
-            ) AS two_plus_star_pct
-        FROM businesses b
-        JOIN reviews r ON b.business_id = r.business_id
-        WHERE b.city = %s
-        GROUP BY b.business_id, b.name, b.address, b.city, b.state, b.postal_code, b.review_count, b.stars
-        HAVING COUNT(*) >= 15
-        ORDER BY five_star_pct DESC
-        LIMIT %s
-    """, (city, top_count))
-
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pg_conn() as conn, conn.cursor() as cursor:
+        execute_prepared(cursor, 'q_high_fives', """
+            SELECT
+                b.business_id,
+                b.name,
+                b.full_address,
+                b.review_count,
+                b.stars,
+                ROUND(s.n_five_star::DECIMAL / s.n_reviews, 4)::float8 AS five_star_pct,
+                ROUND(s.n_two_plus_star::DECIMAL / s.n_reviews, 4)::float8 AS two_plus_star_pct
+            FROM business_stats s
+            JOIN businesses b ON b.business_id = s.business_id
+            WHERE s.city = $1
+              AND s.n_reviews >= 15
+            ORDER BY five_star_pct DESC
+            LIMIT $2
+        """, (city, top_count))
+
+        results = cursor.fetchall()
 
     return results
 
@@ -215,56 +342,160 @@ def topBusiness_in_city(city: str, elite_count: int, top_count: int) -> List[Tup
     Returns:
         List of tuples: (business_id, name, full_address, review_count, stars, elite_review_count)
 
-    Performance: O(n * m) where n = businesses, m = reviews
-    Index used: idx_businesses_city, idx_reviews_business_id, idx_user_elite_years_user_id
+    Performance: O(k) - reads the top k precomputed stats rows for the city
+    Index used: idx_business_stats_city_elite, businesses_pkey
+    Reads the business_stats materialized view: reviews are counted as of its
+    last REFRESH (run by import_data.py after every load)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            b.business_id,
-            b.name,
-            CONCAT(b.address, ', ', b.city, ', ', b.state, ' ', b.postal_code) AS full_address,
-            b.review_count,
-            b.stars,
-            COUNT(DISTINCT r.user_id) AS elite_review_count
-        FROM businesses b
-        JOIN reviews r ON b.business_id = r.business_id
-        WHERE b.city = %s
-          AND r.user_id IN (SELECT user_id FROM user_elite_years)
-        GROUP BY b.business_id, b.name, b.address, b.city, b.state, b.postal_code, b.review_count, b.stars
-        HAVING COUNT(DISTINCT r.user_id) >= %s
-        ORDER BY elite_review_count DESC
-        LIMIT %s
-    """, (city, elite_count, top_count))
-
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pg_conn() as conn, conn.cursor() as cursor:
+        execute_prepared(cursor, 'q_top_business_in_city', """
+            SELECT
+                b.business_id,
+                b.name,
+                b.full_address,
+                b.review_count,
+                b.stars,
+                s.n_elite_reviewers AS elite_review_count
+            FROM business_stats s
+            JOIN businesses b ON b.business_id = s.business_id
+            WHERE s.city = $1
+              AND s.n_elite_reviewers >= $2
+              AND s.n_elite_reviewers > 0  -- never businesses without elite reviews
+            ORDER BY s.n_elite_reviewers DESC
+            LIMIT $3
+        """, (city, elite_count, top_count))
+
+        results = cursor.fetchall()
 
     return results
 
 
+# ============================================================================
+# SERVER-SIDE METRICS
+# ============================================================================
+
+def metrics() -> List[Tuple[str, int, float, float, float, float]]:
+    """
+    Per-query execution statistics collected by pg_stat_statements.
+
+    Timing is measured inside Postgres, across every call since the last
+    stats reset, instead of by @time_query in the client. Requires
+    pg_stat_statements in shared_preload_libraries (see docker-compose.yml).
+
+    Returns:
+        List of tuples: (statement_name, calls, mean_ms, stddev_ms, min_ms, max_ms)
+        slowest mean first
+    """
+    with pg_conn() as conn, conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_stat_statements")
+        # Executions of a prepared statement are recorded under its PREPARE text
+        cursor.execute("""
+            SELECT
+                substring(query FROM '^PREPARE ([a-z_]+)') AS statement_name,
+                calls,
+                ROUND(mean_exec_time::numeric, 3)::float8,
+                ROUND(stddev_exec_time::numeric, 3)::float8,
+                ROUND(min_exec_time::numeric, 3)::float8,
+                ROUND(max_exec_time::numeric, 3)::float8
+            FROM pg_stat_statements
+            WHERE query ~ '^PREPARE q_'
+            ORDER BY mean_exec_time DESC
+        """)
+
+        return cursor.fetchall()
+
+
 # ============================================================================
 # INTERACTIVE TESTING
 # ============================================================================
 
+@lru_cache(maxsize=1)
+def sample_ids():
+    """
+    Return (sample_user, sample_business) for the test harnesses: the most
+    prolific reviewer with loaded reviews and the most reviewed business.
+    Each walks a review_count DESC index from the top (users.review_count is
+    the profile's lifetime counter, so the user must also have a row in
+    reviews); both are fetched in one round trip and cached for the life of
+    the process.
+    """
+    with pg_conn() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                (SELECT user_id FROM users u
+                 WHERE EXISTS (SELECT 1 FROM reviews r WHERE r.user_id = u.user_id)
+                 ORDER BY review_count DESC LIMIT 1),
+                (SELECT business_id FROM businesses ORDER BY review_count DESC LIMIT 1)
+        """)
+        return cursor.fetchone()
+
+
+# Tables and indexes the five queries read, loaded into shared_buffers by
+# warm_up() before anything is timed. The multi-GB reviews and users heaps
+# are left out: no query scans them, they would not fit in shared_buffers,
+# and the untimed query pass faults in the few heap pages actually read.
+WARM_RELATIONS = [
+    'businesses', 'business_stats',
+    'idx_reviews_user_id', 'idx_reviews_business_useful',
+    'idx_businesses_state_open_covering',
+    'idx_business_stats_city_reviews', 'idx_business_stats_city_elite',
+]
+
+
+def prime_connections(count: int):
+    """
+    Hold `count` pooled connections at once and PREPARE every known statement
+    on each, so up to `count` concurrent callers find an open, prepared
+    session instead of paying connect and parse cost on their first call.
+    """
+    # psycopg2 closes a returned connection once minconn are already idle,
+    # so keep at least `count` of them instead of discarding the primed ones
+    pool = _get_pool()
+    pool.minconn = max(pool.minconn, count)
+
+    conns = [get_connection() for _ in range(count)]
+    try:
+        for conn in conns:
+            with conn.cursor() as cursor:
+                for name, sql in _STATEMENTS.items():
+                    _prepare(cursor, name, sql)
+    finally:
+        for conn in conns:
+            release_connection(conn)
+
+
+def warm_up(connections: int = 1):
+    """
+    Prewarm the hot relations and run each query once untimed, so harness
+    timings measure in-memory execution rather than cold-cache reads.
+
+    `connections` is how many queries the caller will run concurrently; that
+    many pooled connections are opened and prepared before returning.
+    """
+    with pg_conn() as conn, conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_prewarm")
+        cursor.execute("SELECT pg_prewarm(rel::regclass) FROM unnest(%s::text[]) AS rel", (WARM_RELATIONS,))
+
+    sample_user, sample_business = sample_ids()
+    average_rating(sample_user)
+    still_there('PA')
+    top_reviews(sample_business)
+    high_fives('Philadelphia', 10)
+    topBusiness_in_city('Philadelphia', 10, 10)
+
+    prime_connections(connections)
+
+
 def test_queries():
     """Test all query functions with sample data"""
     print("="*60)
     print("TESTING QUERY FUNCTIONS")
     print("="*60)
 
+    sample_user, sample_business = sample_ids()
+
     # Test 1: average_rating
     print("\n1. Testing average_rating(user_id)...")
-    # Get a sample user with reviews
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id FROM reviews LIMIT 1")
-    sample_user = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
 
     result = average_rating(sample_user)
     if result:
@@ -279,12 +510,6 @@ def test_queries():
 
     # Test 3: top_reviews
     print("\n3. Testing top_reviews(business_id)...")
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT business_id FROM reviews GROUP BY business_id ORDER BY COUNT(*) DESC LIMIT 1")
-    sample_business = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
 
     reviews = top_reviews(sample_business)
     print(f"   Found {len(reviews)} top reviews for business {sample_business}")
@@ -311,4 +536,5 @@ def test_queries():
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     test_queries()
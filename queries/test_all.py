@@ -5,6 +5,7 @@ Tests both performance and output field correctness to ensure
 all functions meet assignment requirements.
 """
 
+import logging
 import time
 from query_functions import (
     average_rating,
@@ -12,34 +13,49 @@ from query_functions import (
     top_reviews,
     high_fives,
     topBusiness_in_city,
-    get_connection
+    sample_ids,
+    warm_up
 )
 
 
-def test_output_fields():
-    """Test that all functions return correct output fields"""
-    print("="*70)
-    print("OUTPUT FIELD VALIDATION TEST")
-    print("="*70)
+def run_queries():
+    """
+    Run each query function once and keep both its result and its time.
 
-    # Get sample data
-    conn = get_connection()
-    cursor = conn.cursor()
+    All three suites check these same results, so every query executes
+    once per run (after warm_up) against a single snapshot of the data.
+    """
+    sample_user, sample_business = sample_ids()
+    warm_up()
 
-    cursor.execute("SELECT user_id FROM reviews LIMIT 1")
-    sample_user = cursor.fetchone()[0]
+    queries = [
+        ('average_rating', average_rating, (sample_user,)),
+        ('still_there', still_there, ('PA',)),
+        ('top_reviews', top_reviews, (sample_business,)),
+        ('high_fives', high_fives, ('Philadelphia', 10)),
+        ('topBusiness_in_city', topBusiness_in_city, ('Philadelphia', 10, 10)),
+    ]
 
-    cursor.execute("SELECT business_id FROM reviews GROUP BY business_id ORDER BY COUNT(*) DESC LIMIT 1")
-    sample_business = cursor.fetchone()[0]
+    results, times = {}, {}
+    for name, func, args in queries:
+        start = time.perf_counter()
+        results[name] = func(*args)
+        times[name] = time.perf_counter() - start
 
-    cursor.close()
-    conn.close()
+    return results, times
+
+
+def check_output_fields(results):
+    """Test that all functions return correct output fields"""
+    print("="*70)
+    print("OUTPUT FIELD VALIDATION TEST")
+    print("="*70)
 
     all_pass = True
 
     # Test 1: average_rating
     print("\n1. Testing average_rating(user_id)...")
-    result = average_rating(sample_user)
+    result = results['average_rating']
     if result:
         user_name, avg_rating = result
         if isinstance(user_name, str) and isinstance(avg_rating, float):
@@ -54,9 +70,9 @@ def test_output_fields():
 
     # Test 2: still_there
     print("\n2. Testing still_there(state)...")
-    results = still_there('PA')
-    if results and len(results) > 0:
-        biz_id, name, address, lat, lon, stars = results[0]
+    rows = results['still_there']
+    if rows:
+        biz_id, name, address, lat, lon, stars = rows[0]
         # Accept both float and Decimal for numeric types
         from decimal import Decimal
         lat_ok = isinstance(lat, (float, Decimal))
@@ -75,9 +91,9 @@ def test_output_fields():
 
     # Test 3: top_reviews
     print("\n3. Testing top_reviews(business_id)...")
-    results = top_reviews(sample_business)
-    if results and len(results) > 0:
-        user_id, user_name, stars, text = results[0]
+    rows = results['top_reviews']
+    if rows:
+        user_id, user_name, stars, text = rows[0]
         if (isinstance(user_id, str) and isinstance(user_name, str) and
             isinstance(stars, int) and isinstance(text, str)):
             print(f"   ✅ PASS: Returns (user_id, user_name, stars, review_text)")
@@ -91,10 +107,10 @@ def test_output_fields():
 
     # Test 4: high_fives
     print("\n4. Testing high_fives(city, top_count)...")
-    results = high_fives('Philadelphia', 5)
-    if results and len(results) > 0:
+    rows = results['high_fives']
+    if rows:
         from decimal import Decimal
-        biz_id, name, address, review_count, stars, five_pct, two_pct = results[0]
+        biz_id, name, address, review_count, stars, five_pct, two_pct = rows[0]
         stars_ok = isinstance(stars, (float, Decimal))
         five_ok = isinstance(five_pct, (float, Decimal))
         two_ok = isinstance(two_pct, (float, Decimal))
@@ -112,10 +128,10 @@ def test_output_fields():
 
     # Test 5: topBusiness_in_city
     print("\n5. Testing topBusiness_in_city(city, elite_count, top_count)...")
-    results = topBusiness_in_city('Philadelphia', 10, 5)
-    if results and len(results) > 0:
+    rows = results['topBusiness_in_city']
+    if rows:
         from decimal import Decimal
-        biz_id, name, address, review_count, stars, elite_count = results[0]
+        biz_id, name, address, review_count, stars, elite_count = rows[0]
         stars_ok = isinstance(stars, (float, Decimal))
         # elite_count can be int or long
         elite_ok = isinstance(elite_count, (int, Decimal))
@@ -141,7 +157,7 @@ def test_output_fields():
     return all_pass
 
 
-def test_performance():
+def check_performance(times):
     """Test query performance"""
     print("\n" + "="*70)
     print("PERFORMANCE TEST")
@@ -149,66 +165,15 @@ def test_performance():
     print(f"\n{'Status':<5} {'Query':<40} {'Time (ms)':>10}")
     print("-"*70)
 
-    # Get sample data
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT user_id FROM reviews LIMIT 1")
-    sample_user = cursor.fetchone()[0]
-
-    cursor.execute("SELECT business_id FROM reviews GROUP BY business_id ORDER BY COUNT(*) DESC LIMIT 1")
-    sample_business = cursor.fetchone()[0]
-
-    cursor.close()
-    conn.close()
-
-    times = []
-
-    # Test 1: average_rating
-    start = time.perf_counter()
-    average_rating(sample_user)
-    elapsed = time.perf_counter() - start
-    status = "✅" if elapsed < 1.0 else "❌"
-    print(f"{status}    {'average_rating':<40} {elapsed*1000:>10.2f}")
-    times.append(("average_rating", elapsed))
-
-    # Test 2: still_there
-    start = time.perf_counter()
-    still_there('PA')
-    elapsed = time.perf_counter() - start
-    status = "✅" if elapsed < 1.0 else "❌"
-    print(f"{status}    {'still_there':<40} {elapsed*1000:>10.2f}")
-    times.append(("still_there", elapsed))
-
-    # Test 3: top_reviews
-    start = time.perf_counter()
-    top_reviews(sample_business)
-    elapsed = time.perf_counter() - start
-    status = "✅" if elapsed < 1.0 else "❌"
-    print(f"{status}    {'top_reviews':<40} {elapsed*1000:>10.2f}")
-    times.append(("top_reviews", elapsed))
-
-    # Test 4: high_fives
-    start = time.perf_counter()
-    high_fives('Philadelphia', 10)
-    elapsed = time.perf_counter() - start
-    status = "✅" if elapsed < 1.0 else "❌"
-    print(f"{status}    {'high_fives':<40} {elapsed*1000:>10.2f}")
-    times.append(("high_fives", elapsed))
-
-    # Test 5: topBusiness_in_city
-    start = time.perf_counter()
-    topBusiness_in_city('Philadelphia', 10, 10)
-    elapsed = time.perf_counter() - start
-    status = "✅" if elapsed < 1.0 else "⚠️"
-    print(f"{status}    {'topBusiness_in_city':<40} {elapsed*1000:>10.2f}")
-    times.append(("topBusiness_in_city", elapsed))
+    for name, elapsed in times.items():
+        status = "✅" if elapsed < 1.0 else "❌"
+        print(f"{status}    {name:<40} {elapsed*1000:>10.2f}")
 
     print("-"*70)
 
     # Summary
-    total_time = sum(t[1] for t in times)
-    pass_count = sum(1 for t in times if t[1] < 1.0)
+    total_time = sum(times.values())
+    pass_count = sum(1 for elapsed in times.values() if elapsed < 1.0)
 
     print(f"\nTotal execution time: {total_time*1000:.2f}ms")
     print(f"Queries under 1s: {pass_count}/5 ({pass_count/5*100:.0f}%)")
@@ -218,7 +183,7 @@ def test_performance():
     return pass_count >= 4  # 4 out of 5 is acceptable
 
 
-def test_data_quality():
+def check_data_quality(results):
     """Test data quality and edge cases"""
     print("\n" + "="*70)
     print("DATA QUALITY TEST")
@@ -228,33 +193,26 @@ def test_data_quality():
 
     # Test that results respect LIMIT
     print("\n1. Testing LIMIT constraint...")
-    results = still_there('PA')
-    if len(results) <= 9:
-        print(f"   ✅ PASS: still_there returns ≤9 results (got {len(results)})")
+    rows = results['still_there']
+    if len(rows) <= 9:
+        print(f"   ✅ PASS: still_there returns ≤9 results (got {len(rows)})")
     else:
-        print(f"   ❌ FAIL: still_there returns {len(results)} results (should be ≤9)")
+        print(f"   ❌ FAIL: still_there returns {len(rows)} results (should be ≤9)")
         all_pass = False
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT business_id FROM reviews GROUP BY business_id ORDER BY COUNT(*) DESC LIMIT 1")
-    sample_business = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
-
-    results = top_reviews(sample_business)
-    if len(results) <= 7:
-        print(f"   ✅ PASS: top_reviews returns ≤7 results (got {len(results)})")
+    rows = results['top_reviews']
+    if len(rows) <= 7:
+        print(f"   ✅ PASS: top_reviews returns ≤7 results (got {len(rows)})")
     else:
-        print(f"   ❌ FAIL: top_reviews returns {len(results)} results (should be ≤7)")
+        print(f"   ❌ FAIL: top_reviews returns {len(rows)} results (should be ≤7)")
         all_pass = False
 
     # Test percentages are in valid range
     print("\n2. Testing percentage values...")
-    results = high_fives('Philadelphia', 5)
-    if results:
-        five_pct = results[0][5]
-        two_pct = results[0][6]
+    rows = results['high_fives']
+    if rows:
+        five_pct = rows[0][5]
+        two_pct = rows[0][6]
         if 0 <= five_pct <= 1 and 0 <= two_pct <= 1:
             print(f"   ✅ PASS: Percentages in valid range [0, 1]")
         else:
@@ -263,9 +221,9 @@ def test_data_quality():
 
     # Test coordinates are valid
     print("\n3. Testing geographic coordinates...")
-    results = still_there('PA')
-    if results:
-        lat, lon = results[0][3], results[0][4]
+    rows = results['still_there']
+    if rows:
+        lat, lon = rows[0][3], rows[0][4]
         if -90 <= lat <= 90 and -180 <= lon <= 180:
             print(f"   ✅ PASS: Coordinates valid ({lat}, {lon})")
         else:
@@ -288,10 +246,11 @@ def main():
     print("COMPREHENSIVE QUERY FUNCTION TEST SUITE")
     print("="*70)
 
-    # Run all test suites
-    output_pass = test_output_fields()
-    performance_pass = test_performance()
-    quality_pass = test_data_quality()
+    # Execute every query once, then run all test suites on the results
+    results, times = run_queries()
+    output_pass = check_output_fields(results)
+    performance_pass = check_performance(times)
+    quality_pass = check_data_quality(results)
 
     # Final summary
     print("\n" + "="*70)
@@ -311,4 +270,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Show @time_query lines when QUERY_TIMING is set
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main()
@@ -111,6 +111,18 @@ CREATE INDEX idx_checkins_business_time ON checkins(business_id, checkin_time);
 -- QUERY-SPECIFIC INDEXES (Add based on actual query requirements)
 -- ============================================================================
 
+-- Query 3 (top_reviews): a business's reviews already in useful order, so
+-- the LIMIT 7 scan stops after seven index entries. Not index-only: the query
+-- returns review text, so seven heap fetches per call are expected. Do not
+-- add INCLUDE (text) - it would copy the largest column into the index.
+CREATE INDEX idx_reviews_business_useful ON reviews(business_id, useful DESC);
+
+-- Query 2 (still_there): open businesses per state already in review_count
+-- order, covering the returned columns; LIMIT 9 stops after nine entries
+CREATE INDEX idx_businesses_state_open_covering ON businesses(state, review_count DESC)
+    INCLUDE (business_id, name, full_address, latitude, longitude, stars)
+    WHERE is_open = 1;
+
 -- Example: Finding businesses with reviews in date range
 -- CREATE INDEX idx_reviews_business_date_range ON reviews(business_id, date) WHERE date >= '2020-01-01';
 
@@ -12,6 +12,8 @@ DROP TABLE IF EXISTS business_attributes CASCADE;
 DROP TABLE IF EXISTS business_hours CASCADE;
 DROP TABLE IF EXISTS business_categories CASCADE;
 DROP TABLE IF EXISTS businesses CASCADE;
+DROP FUNCTION IF EXISTS fill_review_user_name() CASCADE;
+DROP FUNCTION IF EXISTS sync_review_user_name() CASCADE;
 
 -- ============================================================================
 -- BUSINESS TABLES
@@ -30,6 +32,12 @@ CREATE TABLE businesses (
     stars DECIMAL(2, 1),
     review_count INTEGER DEFAULT 0,
     is_open SMALLINT DEFAULT 1,
+    -- Display address returned by the queries, formatted once at write time
+    -- (same output as CONCAT(address, ', ', city, ', ', state, ' ', postal_code))
+    full_address TEXT GENERATED ALWAYS AS (
+        COALESCE(address, '') || ', ' || COALESCE(city, '') || ', ' ||
+        COALESCE(state, '') || ' ' || COALESCE(postal_code, '')
+    ) STORED,
     CONSTRAINT valid_stars CHECK (stars >= 0 AND stars <= 5),
     CONSTRAINT valid_is_open CHECK (is_open IN (0, 1))
 );
@@ -124,11 +132,38 @@ CREATE TABLE reviews (
     useful INTEGER DEFAULT 0,
     funny INTEGER DEFAULT 0,
     cool INTEGER DEFAULT 0,
+    user_name VARCHAR(255),  -- Copy of users.name so top_reviews needs no join
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (business_id) REFERENCES businesses(business_id) ON DELETE CASCADE,
     CONSTRAINT valid_review_stars CHECK (stars >= 1 AND stars <= 5)
 );
 
+-- Keep reviews.user_name in step with users.name. The importer fills
+-- user_name in its merge, so the insert trigger only fires for other writers.
+CREATE FUNCTION fill_review_user_name() RETURNS trigger AS $$
+BEGIN
+    SELECT name INTO NEW.user_name FROM users WHERE user_id = NEW.user_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reviews_fill_user_name
+    BEFORE INSERT ON reviews
+    FOR EACH ROW WHEN (NEW.user_name IS NULL)
+    EXECUTE FUNCTION fill_review_user_name();
+
+CREATE FUNCTION sync_review_user_name() RETURNS trigger AS $$
+BEGIN
+    UPDATE reviews SET user_name = NEW.name WHERE user_id = NEW.user_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_sync_review_user_name
+    AFTER UPDATE OF name ON users
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION sync_review_user_name();
+
 -- Tips
 CREATE TABLE tips (
     tip_id SERIAL PRIMARY KEY,
@@ -123,7 +123,13 @@ def main():
         "Create all indexes and analyze tables"
     )
 
-    # Step 3: Verify
+    # Step 3: Create materialized views
+    execute_sql_file(
+        base_dir / 'schema' / 'create_views.sql',
+        "Create materialized views used by the queries"
+    )
+
+    # Step 4: Verify
     verify_schema()
 
     print(f"\n{'='*60}")